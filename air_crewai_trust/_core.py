@@ -0,0 +1,82 @@
+"""
+air-crewai-trust — Hook Core
+
+Pure per-event helpers used by the hook handlers and trust components:
+message content extraction, input sizing, risk mapping and case folding.
+Nothing here holds state, and everything is fully annotated so the
+module can be compiled with mypyc as-is; the plain Python module is
+used otherwise.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable
+
+# Content extractors keyed on the exact message type; one dict lookup
+# covers the common cases. Anything else goes through _fallback_content().
+_CONTENT_EXTRACTORS: dict[type, Callable[[Any], str]] = {
+    dict: lambda msg: str(msg.get("content", "")),
+    str: lambda msg: msg,
+}
+
+
+def _fallback_content(msg: Any) -> str | None:
+    if isinstance(msg, dict):
+        return str(msg.get("content", ""))
+    if isinstance(msg, str):
+        return str(msg)
+    try:
+        return str(msg.content)
+    except AttributeError:
+        return None
+
+
+def extract_messages(messages: Any) -> list[tuple[Any, str]]:
+    """(message, text content) pairs for every message that has content."""
+    extracted: list[tuple[Any, str]] = []
+    for msg in messages:
+        extract = _CONTENT_EXTRACTORS.get(type(msg))
+        content = extract(msg) if extract is not None else _fallback_content(msg)
+        if content is not None:
+            extracted.append((msg, content))
+    return extracted
+
+
+def text_size(obj: Any) -> int:
+    """Total length of the strings in a JSON-like object."""
+    if isinstance(obj, str):
+        return len(obj)
+    if isinstance(obj, dict):
+        return sum(text_size(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(text_size(v) for v in obj)
+    return 0
+
+
+# re.IGNORECASE matches U+0130/U+0131 against "i", but casefold() and
+# RE2 don't map them onto a plain "i"
+_DOTTED_I = str.maketrans({"\u0130": "i", "\u0131": "i"})
+
+
+def fold_dotted_i(text: str) -> str:
+    """Map U+0130/U+0131 to "i"; other characters are left alone."""
+    if text.isascii():
+        return text
+    return text.translate(_DOTTED_I)
+
+
+def fold_case(text: str) -> str:
+    """
+    Casefold text so that a substring check against lowercase literals
+    finds everything an re.IGNORECASE match on those literals would.
+    """
+    return fold_dotted_i(text).casefold()
+
+
+def injection_risk(score: float) -> str:
+    """Audit risk level for an injection detection score."""
+    if score >= 0.8:
+        return "critical"
+    if score >= 0.5:
+        return "high"
+    return "medium"
@@ -0,0 +1,222 @@
+"""
+air-crewai-trust — Gateway forwarder
+
+Sends JSON payloads to the AIR Blackbox gateway from a background
+thread over one keep-alive connection. post() never blocks the
+caller: when the bounded queue is full the payload is dropped.
+
+Like urllib, the forwarder honours HTTP(S)_PROXY and NO_PROXY
+(HTTPS goes through a CONNECT tunnel) and follows redirects.
+"""
+
+from __future__ import annotations
+
+import atexit
+import base64
+import http.client
+import logging
+import queue
+import threading
+import time
+import urllib.request
+import weakref
+from typing import Any
+from urllib.parse import SplitResult, unquote, urljoin, urlsplit
+
+from . import _json
+
+# Seconds the sender thread stays alive without new payloads
+_IDLE_SECONDS = 1.0
+
+# Redirect statuses urllib's default opener follows
+_REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+
+logger = logging.getLogger("air_crewai_trust")
+
+_live_forwarders: weakref.WeakSet[GatewayForwarder] = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_live_forwarders() -> None:
+    for forwarder in list(_live_forwarders):
+        forwarder.flush(timeout=5.0)
+
+
+class GatewayForwarder:
+    """Best-effort, non-blocking POSTs to the gateway."""
+
+    def __init__(
+        self,
+        gateway_url: str,
+        gateway_key: str | None = None,
+        *,
+        max_pending: int = 10_000,
+        timeout: float = 5.0,
+    ) -> None:
+        parts = urlsplit(gateway_url)
+        self._https = parts.scheme == "https"
+        self._netloc = parts.netloc
+        self._url = gateway_url.rstrip("/")
+        self._headers = {"Content-Type": "application/json"}
+        if gateway_key:
+            self._headers["Authorization"] = f"Bearer {gateway_key}"
+        self._timeout = timeout
+
+        # Resolved once, from the same settings urllib.request uses
+        self._proxy = self._resolve_proxy(parts)
+        self._request_prefix = parts.path.rstrip("/")
+        self._request_headers = self._headers
+        if self._proxy is not None and not self._https:
+            # Plain HTTP proxies take the absolute URL on the request line
+            self._request_prefix = self._url
+            self._request_headers = {**self._headers, **self._proxy[1]}
+
+        self._lock = threading.Lock()
+        self._queue: queue.Queue[tuple[str, bytes] | threading.Event] = (
+            queue.Queue(maxsize=max_pending)
+        )
+        self._worker: threading.Thread | None = None
+        self._conn: http.client.HTTPConnection | None = None
+        self._dropped = 0
+
+    def post(self, path: str, payload: Any) -> bool:
+        """
+        Queue payload for POSTing to path (relative to the gateway URL).
+        Returns False if the queue was full and the payload was dropped.
+        """
+        try:
+            self._queue.put_nowait((path, _json.dumps(payload)))
+        except queue.Full:
+            self._dropped += 1
+            if self._dropped % 1000 == 1:
+                logger.warning(
+                    f"Gateway queue full, dropping payloads "
+                    f"({self._dropped} dropped so far)"
+                )
+            return False
+        self._ensure_worker()
+        return True
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Block until every queued payload has been sent (or given up on).
+        Returns False if the timeout expired first.
+        """
+        with self._lock:
+            if self._worker is None and self._queue.empty():
+                return True
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        self._ensure_worker()
+        if deadline is None:
+            return done.wait()
+        return done.wait(max(deadline - time.monotonic(), 0))
+
+    # --- Private ---
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name="air-gateway-sender", daemon=True
+                )
+                self._worker.start()
+                _live_forwarders.add(self)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=_IDLE_SECONDS)
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        self._worker = None
+                        self._close()
+                        return
+                continue
+
+            if isinstance(item, threading.Event):
+                item.set()
+            else:
+                self._send(*item)
+
+    def _send(self, path: str, body: bytes) -> None:
+        # Two attempts: the server may have closed a kept-alive connection
+        for _ in range(2):
+            conn = self._connection()
+            try:
+                conn.request(
+                    "POST", self._request_prefix + path, body, self._request_headers
+                )
+                response = conn.getresponse()
+                response.read()
+                break
+            except (OSError, http.client.HTTPException):
+                self._close()
+        else:
+            return  # Silent fail — gateway forwarding is best-effort
+
+        location = response.getheader("Location")
+        if response.status in _REDIRECT_STATUSES and location:
+            self._send_redirected(urljoin(self._url + path, location), body)
+
+    def _send_redirected(self, url: str, body: bytes) -> None:
+        # Rare enough to not need the kept-alive connection; urllib applies
+        # the proxy settings and its own rules for any further redirects
+        request = urllib.request.Request(url, body, self._headers, method="POST")
+        try:
+            urllib.request.urlopen(request, timeout=self._timeout).close()
+        except (OSError, http.client.HTTPException):
+            pass
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self._conn is None:
+            if self._proxy is None:
+                conn_cls = (
+                    http.client.HTTPSConnection
+                    if self._https
+                    else http.client.HTTPConnection
+                )
+                self._conn = conn_cls(self._netloc, timeout=self._timeout)
+            elif self._https:
+                proxy_netloc, proxy_headers = self._proxy
+                self._conn = http.client.HTTPSConnection(
+                    proxy_netloc, timeout=self._timeout
+                )
+                self._conn.set_tunnel(self._netloc, headers=proxy_headers)
+            else:
+                self._conn = http.client.HTTPConnection(
+                    self._proxy[0], timeout=self._timeout
+                )
+        return self._conn
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @staticmethod
+    def _resolve_proxy(parts: SplitResult) -> tuple[str, dict[str, str]] | None:
+        """
+        Proxy (netloc, extra headers) for the gateway URL, or None to
+        connect directly.
+        """
+        proxy_url = urllib.request.getproxies().get(parts.scheme)
+        if not proxy_url or urllib.request.proxy_bypass(parts.netloc):
+            return None
+
+        if "://" not in proxy_url:
+            proxy_url = "http://" + proxy_url
+        proxy = urlsplit(proxy_url)
+        headers = {}
+        if proxy.username is not None:
+            credentials = f"{unquote(proxy.username)}:{unquote(proxy.password or '')}"
+            headers["Proxy-Authorization"] = (
+                "Basic " + base64.b64encode(credentials.encode()).decode()
+            )
+        return proxy.netloc.rpartition("@")[2], headers
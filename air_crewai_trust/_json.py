@@ -0,0 +1,26 @@
+"""
+air-crewai-trust — JSON helpers
+
+Thin wrapper that uses orjson when it is installed and falls back
+to the standard library otherwise. dumps() always returns bytes.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            pass  # e.g. ints wider than 64 bits — let the stdlib handle it
+    return json.dumps(obj).encode()
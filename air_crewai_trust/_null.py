@@ -0,0 +1,88 @@
+"""
+air-crewai-trust — Disabled components
+
+Stand-ins the plugin uses for components switched off in the config.
+Each one answers the same calls as the real component but does no
+work, so the hook handlers run straight through without checking
+per-component enabled flags.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from .audit_ledger import AuditEntry, ChainVerification
+from .consent_gate import ConsentGate
+from .injection_detector import InjectionResult
+
+
+class NullAuditLedger:
+    """Records nothing and never touches the filesystem."""
+
+    def append(self, **kwargs: Any) -> AuditEntry | None:
+        return None
+
+    def flush(self, timeout: float | None = None) -> bool:
+        return True
+
+    def verify(self) -> ChainVerification:
+        return ChainVerification(valid=True, total_entries=0)
+
+    def get_recent(self, n: int = 50) -> list[AuditEntry]:
+        return []
+
+    def export(self) -> list[dict[str, Any]]:
+        return []
+
+    def stats(self) -> dict[str, Any]:
+        return {"total_entries": 0, "chain_valid": True}
+
+
+class NullDataVault:
+    """Passes every input through unchanged."""
+
+    def tokenize(self, text: str) -> dict[str, Any]:
+        return {"result": text, "tokenized": False, "count": 0}
+
+    def tokenize_many(self, texts: list[str]) -> list[dict[str, Any]]:
+        return [self.tokenize(text) for text in texts]
+
+    def tokenize_obj(self, obj: Any) -> tuple[Any, bool]:
+        return obj, False
+
+    def detokenize(self, text: str) -> str:
+        return text
+
+    def stats(self) -> dict[str, Any]:
+        return {"total_tokens": 0, "by_category": {}}
+
+    def cleanup(self) -> int:
+        return 0
+
+    def flush(self, timeout: float | None = None) -> bool:
+        return True
+
+
+class NullInjectionDetector:
+    """Reports every input as clean."""
+
+    def scan(self, content: str) -> InjectionResult:
+        return InjectionResult(detected=False, score=0.0, patterns=[], blocked=False)
+
+    def get_active_patterns(self) -> list[str]:
+        return []
+
+
+class PassthroughConsentGate(ConsentGate):
+    """
+    Never prompts or blocks, but still classifies tools so audit rows
+    carry the right risk level.
+    """
+
+    def intercept(
+        self,
+        tool_name: str,
+        tool_args: dict[str, Any],
+        prompt_fn: Any | None = None,
+    ) -> dict[str, Any]:
+        return {"blocked": False}
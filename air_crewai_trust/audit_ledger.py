@@ -6,24 +6,57 @@ Each entry includes the hash of the previous entry, creating
 a blockchain-style chain. Modifying any entry breaks the chain.
 
 Supports local JSON persistence and optional forwarding to
-the AIR Blackbox gateway.
+the AIR Blackbox gateway. Persistence happens on a background
+writer thread in batches, which hands each batch to a separate
+gateway sender, so append() never blocks on I/O.
 """
 
 from __future__ import annotations
 
+import atexit
 import hashlib
 import hmac
 import json
+import logging
 import os
+import queue
+import sys
+import threading
+import time
 import uuid
+import weakref
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+from ._gateway import GatewayForwarder
 from .config import AuditLedgerConfig
 
 GENESIS_HASH = "0" * 64
 
+# Seconds the background writer stays alive without new entries
+_WORKER_IDLE_SECONDS = 1.0
+
+logger = logging.getLogger("air_crewai_trust")
+
+# Ledgers with a writer thread; flushed at interpreter exit since the
+# writer is a daemon thread and would otherwise drop pending entries.
+_live_ledgers: weakref.WeakSet[AuditLedger] = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_live_ledgers() -> None:
+    for ledger in list(_live_ledgers):
+        ledger.flush(timeout=5.0)
+
+
+def _content_hash(content: dict[str, Any]) -> str:
+    """SHA-256 of an entry's content fields in canonical JSON form."""
+    # Stays on stdlib json on purpose: these exact bytes are the chain's
+    # canonical format, so changing them would break existing ledgers.
+    canonical = json.dumps(content, sort_keys=True).encode()
+    return hashlib.sha256(canonical).hexdigest()
+
 
 class AuditEntry:
     """A single signed entry in the audit chain."""
@@ -98,7 +131,18 @@ class AuditEntry:
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> AuditEntry:
-        return cls(**data)
+        entry = cls(**data)
+        # A loaded chain repeats a handful of actions, tool names and risk
+        # levels thousands of times — share one string object per value.
+        # A tampered file may hold other types here; keep them as-is so
+        # verify() can report the mismatch.
+        if isinstance(entry.action, str):
+            entry.action = sys.intern(entry.action)
+        if isinstance(entry.risk_level, str):
+            entry.risk_level = sys.intern(entry.risk_level)
+        if isinstance(entry.tool_name, str):
+            entry.tool_name = sys.intern(entry.tool_name)
+        return entry
 
 
 class ChainVerification:
@@ -152,6 +196,19 @@ class AuditLedger:
         self._last_hash: str = GENESIS_HASH
         self._sequence: int = 0
 
+        # Guards chain state; the writer thread snapshots under it
+        self._lock = threading.Lock()
+        self._queue: queue.SimpleQueue[AuditEntry | threading.Event] = (
+            queue.SimpleQueue()
+        )
+        self._worker: threading.Thread | None = None
+        self._forwarder: GatewayForwarder | None = None
+        if config.forward_to_gateway and gateway_url:
+            self._forwarder = GatewayForwarder(gateway_url, gateway_key)
+
+        # Created once here; the writer thread never recreates it
+        Path(config.local_path).parent.mkdir(parents=True, exist_ok=True)
+
         # Load or generate HMAC key
         key_path = config.local_path.replace(".json", "") + ".key"
         if os.path.exists(key_path):
@@ -179,70 +236,90 @@ class AuditLedger:
         injection_detected: bool = False,
         metadata: dict[str, Any] | None = None,
     ) -> AuditEntry:
-        """Append an action to the audit chain. Returns the signed entry."""
-        self._sequence += 1
+        """
+        Append an action to the audit chain. Returns the signed entry.
 
+        The entry is chained and signed immediately; writing it to disk
+        and forwarding it to the gateway happen in the background.
+        Call flush() to wait for that.
+        """
         entry_id = str(uuid.uuid4())
         timestamp = datetime.now(timezone.utc).isoformat()
 
-        # Compute content hash
-        content_for_hash = json.dumps(
-            {
-                "id": entry_id,
-                "sequence": self._sequence,
-                "timestamp": timestamp,
-                "action": action,
-                "tool_name": tool_name,
-                "risk_level": risk_level,
-                "consent_required": consent_required,
-                "consent_granted": consent_granted,
-                "data_tokenized": data_tokenized,
-                "injection_detected": injection_detected,
-                "metadata": metadata or {},
-            },
-            sort_keys=True,
-        )
-        record_hash = hashlib.sha256(content_for_hash.encode()).hexdigest()
-
-        # HMAC signature chains this entry to the previous one
-        sig_payload = f"{self._sequence}|{entry_id}|{record_hash}|{self._last_hash}"
-        signature = hmac.new(
-            self._secret, sig_payload.encode(), hashlib.sha256
-        ).hexdigest()
-
-        entry = AuditEntry(
-            id=entry_id,
-            sequence=self._sequence,
-            hash=record_hash,
-            prev_hash=self._last_hash,
-            signature=signature,
-            timestamp=timestamp,
-            action=action,
-            tool_name=tool_name,
-            risk_level=risk_level,
-            consent_required=consent_required,
-            consent_granted=consent_granted,
-            data_tokenized=data_tokenized,
-            injection_detected=injection_detected,
-            metadata=metadata or {},
-        )
+        with self._lock:
+            self._sequence += 1
 
-        self._last_hash = record_hash
-        self._entries.append(entry)
+            record_hash = _content_hash(
+                {
+                    "id": entry_id,
+                    "sequence": self._sequence,
+                    "timestamp": timestamp,
+                    "action": action,
+                    "tool_name": tool_name,
+                    "risk_level": risk_level,
+                    "consent_required": consent_required,
+                    "consent_granted": consent_granted,
+                    "data_tokenized": data_tokenized,
+                    "injection_detected": injection_detected,
+                    "metadata": metadata or {},
+                }
+            )
 
-        # Trim if over max
-        if self.config.max_entries > 0 and len(self._entries) > self.config.max_entries:
-            self._entries = self._entries[-self.config.max_entries :]
+            # HMAC signature chains this entry to the previous one
+            signature = self._sign(
+                self._sequence, entry_id, record_hash, self._last_hash
+            )
+
+            entry = AuditEntry(
+                id=entry_id,
+                sequence=self._sequence,
+                hash=record_hash,
+                prev_hash=self._last_hash,
+                signature=signature,
+                timestamp=timestamp,
+                action=action,
+                tool_name=tool_name,
+                risk_level=risk_level,
+                consent_required=consent_required,
+                consent_granted=consent_granted,
+                data_tokenized=data_tokenized,
+                injection_detected=injection_detected,
+                metadata=metadata or {},
+            )
 
-        # Persist locally
-        self._save_chain()
+            self._last_hash = record_hash
+            self._entries.append(entry)
 
-        # Non-blocking forward to gateway
-        if self.config.forward_to_gateway and self._gateway_url:
-            self._forward_entry(entry)
+            # Trim if over max
+            if self.config.max_entries > 0 and len(self._entries) > self.config.max_entries:
+                self._entries = self._entries[-self.config.max_entries :]
 
+        self._queue.put(entry)
+        self._ensure_worker()
         return entry
 
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Block until every appended entry has been persisted (and
+        forwarded, if enabled). Returns False if the timeout expired.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            idle = self._worker is None and self._queue.empty()
+
+        if not idle:
+            done = threading.Event()
+            self._queue.put(done)
+            self._ensure_worker()
+            if not done.wait(timeout):
+                return False
+
+        if self._forwarder is None:
+            return True
+        if deadline is None:
+            return self._forwarder.flush()
+        return self._forwarder.flush(max(deadline - time.monotonic(), 0))
+
     def verify(self) -> ChainVerification:
         """Verify the integrity of the entire chain."""
         if not self._entries:
@@ -262,7 +339,7 @@ class AuditLedger:
                 )
 
             # Recompute content hash
-            content_for_hash = json.dumps(
+            computed_hash = _content_hash(
                 {
                     "id": entry.id,
                     "sequence": entry.sequence,
@@ -275,10 +352,8 @@ class AuditLedger:
                     "data_tokenized": entry.data_tokenized,
                     "injection_detected": entry.injection_detected,
                     "metadata": entry.metadata,
-                },
-                sort_keys=True,
+                }
             )
-            computed_hash = hashlib.sha256(content_for_hash.encode()).hexdigest()
 
             if entry.hash != computed_hash:
                 return ChainVerification(
@@ -290,12 +365,9 @@ class AuditLedger:
                 )
 
             # Verify HMAC signature
-            sig_payload = (
-                f"{entry.sequence}|{entry.id}|{entry.hash}|{entry.prev_hash}"
+            expected_sig = self._sign(
+                entry.sequence, entry.id, entry.hash, entry.prev_hash
             )
-            expected_sig = hmac.new(
-                self._secret, sig_payload.encode(), hashlib.sha256
-            ).hexdigest()
 
             if entry.signature != expected_sig:
                 return ChainVerification(
@@ -332,14 +404,27 @@ class AuditLedger:
 
     # --- Private ---
 
+    def _sign(self, sequence: int, entry_id: str, record_hash: str, prev_hash: str) -> str:
+        payload = f"{sequence}|{entry_id}|{record_hash}|{prev_hash}".encode()
+        # One-shot HMAC — runs entirely in OpenSSL, no Python-level hmac object
+        return hmac.digest(self._secret, payload, "sha256").hex()
+
     def _load_chain(self) -> None:
         if os.path.exists(self.config.local_path):
             try:
-                with open(self.config.local_path, "r") as f:
-                    data = json.load(f)
-                self._entries = [
-                    AuditEntry.from_dict(e) for e in data.get("entries", [])
-                ]
+                # stdlib json on both ends: orjson reads wide ints back as
+                # floats and writes NaN/inf as null, which would break the
+                # content hashes of a reloaded chain
+                with open(self.config.local_path, "rb") as f:
+                    data = json.loads(f.read())
+                entries: list[AuditEntry] = []
+                for e in data.get("entries", []):
+                    entry = AuditEntry.from_dict(e)
+                    # prev_hash repeats the previous entry's hash; share it
+                    if entries and entry.prev_hash == entries[-1].hash:
+                        entry.prev_hash = entries[-1].hash
+                    entries.append(entry)
+                self._entries = entries
                 self._sequence = data.get("sequence", 0)
                 self._last_hash = data.get("last_hash", GENESIS_HASH)
             except (json.JSONDecodeError, KeyError):
@@ -348,37 +433,99 @@ class AuditLedger:
                 self._last_hash = GENESIS_HASH
 
     def _save_chain(self) -> None:
-        Path(self.config.local_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            entries = list(self._entries)
+            sequence = self._sequence
+            last_hash = self._last_hash
+
         data = {
-            "entries": [e.to_dict() for e in self._entries],
-            "sequence": self._sequence,
-            "last_hash": self._last_hash,
+            "entries": [e.to_dict() for e in entries],
+            "sequence": sequence,
+            "last_hash": last_hash,
             "saved_at": datetime.now(timezone.utc).isoformat(),
         }
-        with open(self.config.local_path, "w") as f:
-            json.dump(data, f, indent=2)
+        # If the directory was removed after __init__, fail rather than
+        # recreate it and leave an orphaned ledger without its key
+        with open(self.config.local_path, "wb") as f:
+            f.write(json.dumps(data, indent=2).encode())
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._drain, name="air-audit-writer", daemon=True
+                )
+                self._worker.start()
+                _live_ledgers.add(self)
 
-    def _forward_entry(self, entry: AuditEntry) -> None:
-        """Best-effort forward to gateway (non-blocking)."""
-        if not self._gateway_url:
-            return
+    def _drain(self) -> None:
+        """Writer thread: persist and forward queued entries in batches."""
         try:
-            import urllib.request
-
-            url = f"{self._gateway_url}/v1/audit"
-            req = urllib.request.Request(
-                url,
-                data=json.dumps(entry.to_dict()).encode(),
-                headers={
-                    "Content-Type": "application/json",
-                    **(
-                        {"Authorization": f"Bearer {self._gateway_key}"}
-                        if self._gateway_key
-                        else {}
-                    ),
-                },
-                method="POST",
-            )
-            urllib.request.urlopen(req, timeout=5)
+            self._drain_batches()
+        finally:
+            # However the thread ends, let _ensure_worker() start another
+            with self._lock:
+                if self._worker is threading.current_thread():
+                    self._worker = None
+
+    def _drain_batches(self) -> None:
+        max_wait = self.config.batch_max_wait_ms / 1000
+        batch_size = max(self.config.batch_size, 1)
+
+        while True:
+            try:
+                item = self._queue.get(timeout=_WORKER_IDLE_SECONDS)
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        self._worker = None
+                        return
+                continue
+
+            batch: list[AuditEntry] = []
+            waiters: list[threading.Event] = []
+            deadline = time.monotonic() + max_wait
+            while True:
+                if isinstance(item, threading.Event):
+                    # Flush request — write what we have right away
+                    waiters.append(item)
+                    break
+                batch.append(item)
+                remaining = deadline - time.monotonic()
+                if len(batch) >= batch_size or remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            try:
+                if batch:
+                    self._write_batch(batch)
+            except Exception:
+                logger.warning("Failed to write audit batch", exc_info=True)
+            finally:
+                for waiter in waiters:
+                    waiter.set()
+
+    def _write_batch(self, batch: list[AuditEntry]) -> None:
+        try:
+            self._save_chain()
         except Exception:
-            pass  # Silent fail — gateway forwarding is best-effort
+            logger.warning("Failed to persist audit ledger", exc_info=True)
+
+        if self._forwarder is not None:
+            # Queued for the sender thread; a slow gateway never holds
+            # up the next write
+            try:
+                if self.config.gateway_batch:
+                    self._forwarder.post(
+                        "/v1/audit/batch", [e.to_dict() for e in batch]
+                    )
+                else:
+                    for entry in batch:
+                        self._forwarder.post("/v1/audit", entry.to_dict())
+            except Exception:
+                logger.warning("Failed to forward audit entries", exc_info=True)
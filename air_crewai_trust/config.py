@@ -52,6 +52,18 @@ class AuditLedgerConfig(BaseModel):
     )
     forward_to_gateway: bool = False
     max_entries: int = 10_000
+    # Entries are persisted by a background writer in batches of up to
+    # batch_size, waiting at most batch_max_wait_ms to fill a batch.
+    batch_size: int = 256
+    batch_max_wait_ms: float = 50.0
+    # Forward each writer batch as one JSON array to /v1/audit/batch
+    # instead of one POST per entry to /v1/audit. Only enable this for
+    # a gateway that serves the batch endpoint.
+    gateway_batch: bool = False
+    # Skip the tool_result row for tool calls where nothing notable
+    # happened (no consent needed, nothing tokenized); the tool_call row
+    # already records them. Otherwise tool_result carries the pre-call state.
+    coalesce_results: bool = False
 
 
 class VaultConfig(BaseModel):
@@ -81,3 +93,12 @@ class AirTrustConfig(BaseModel):
     )
     gateway_url: str | None = None
     gateway_key: str | None = None
+    # Inputs with more text than this skip tokenization and injection
+    # scanning (logged to the audit ledger). 0 disables the limit.
+    max_scan_chars: int = 10 * 1024 * 1024
+    # Wall-clock budget per hook, in milliseconds. When set, hooks run on
+    # a small thread pool: before-hooks that overrun are allowed through
+    # (and logged), after-hooks don't wait at all. None disables.
+    # before_tool_call stays unbounded while the consent gate is enabled,
+    # since a timeout would skip the consent prompt.
+    hook_deadline_ms: float | None = None
@@ -86,36 +86,49 @@ class ConsentGate:
     """
 
     def __init__(self, config: ConsentGateConfig, ledger: AuditLedger) -> None:
-        self.config = config
         self._ledger = ledger
+        # Per-tool memo of classify_risk / requires_consent results
+        self._risk_cache: dict[str, RiskLevel] = {}
+        self._consent_cache: dict[str, bool] = {}
+        self.config = config
 
-    def classify_risk(self, tool_name: str) -> RiskLevel:
-        """Classify risk level for a tool."""
-        # Exact match first
-        if tool_name in TOOL_RISK_MAP:
-            return TOOL_RISK_MAP[tool_name]
+    @property
+    def config(self) -> ConsentGateConfig:
+        return self._config
 
-        # Partial match — check if tool name contains any risk keyword
-        lower = tool_name.lower()
-        for pattern, level in TOOL_RISK_MAP.items():
-            if pattern in lower:
-                return level
+    @config.setter
+    def config(self, config: ConsentGateConfig) -> None:
+        self._config = config
+        self.clear_cache()
 
-        return RiskLevel.LOW
+    def clear_cache(self) -> None:
+        """
+        Drop memoized risk/consent decisions. Called automatically when
+        the config is replaced; call it manually after mutating the
+        current config in place.
+        """
+        self._risk_cache.clear()
+        self._consent_cache.clear()
+
+    def classify_risk(self, tool_name: str) -> RiskLevel:
+        """Classify risk level for a tool."""
+        risk = self._risk_cache.get(tool_name)
+        if risk is None:
+            risk = self._risk_cache[tool_name] = self._classify_risk(tool_name)
+        return risk
 
     def requires_consent(self, tool_name: str) -> bool:
         """Check if a tool call requires consent."""
-        # Explicit never-require list
-        if tool_name in self.config.never_require:
-            return False
-
-        # Explicit always-require list
-        if tool_name in self.config.always_require:
-            return True
+        required = self._consent_cache.get(tool_name)
+        if required is None:
+            required = self._consent_cache[tool_name] = self._requires_consent(
+                tool_name
+            )
+        return required
 
-        # Risk threshold check
-        risk = self.classify_risk(tool_name)
-        return RISK_ORDER[risk] >= RISK_ORDER[self.config.risk_threshold]
+    def assess(self, tool_name: str) -> tuple[RiskLevel, bool]:
+        """Return (risk level, consent required) for a tool in one call."""
+        return self.classify_risk(tool_name), self.requires_consent(tool_name)
 
     def intercept(
         self,
@@ -206,6 +219,32 @@ class ConsentGate:
             ]
         )
 
+    def _classify_risk(self, tool_name: str) -> RiskLevel:
+        # Exact match first
+        if tool_name in TOOL_RISK_MAP:
+            return TOOL_RISK_MAP[tool_name]
+
+        # Partial match — check if tool name contains any risk keyword
+        lower = tool_name.lower()
+        for pattern, level in TOOL_RISK_MAP.items():
+            if pattern in lower:
+                return level
+
+        return RiskLevel.LOW
+
+    def _requires_consent(self, tool_name: str) -> bool:
+        # Explicit never-require list
+        if tool_name in self.config.never_require:
+            return False
+
+        # Explicit always-require list
+        if tool_name in self.config.always_require:
+            return True
+
+        # Risk threshold check
+        risk = self.classify_risk(tool_name)
+        return RISK_ORDER[risk] >= RISK_ORDER[self.config.risk_threshold]
+
     def _console_prompt(self, message: str) -> bool:
         """Prompt user via console. Returns True if approved."""
         try:
@@ -11,22 +11,37 @@ Token format: [AIR:vault:category:tokenId]
 
 from __future__ import annotations
 
-import json
 import re
 import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
+from ._core import fold_case
+from ._gateway import GatewayForwarder
 from .config import VaultConfig
 
 
 class TokenizationPattern:
-    """A regex pattern for detecting sensitive data."""
+    """
+    A regex pattern for detecting sensitive data.
+
+    triggers: literals of which at least one must occur in any match
+    (lowercase for case-insensitive patterns). When none occur in the
+    text the regex is skipped. Empty means the regex always runs.
+    """
 
-    def __init__(self, name: str, category: str, regex: re.Pattern[str]) -> None:
+    def __init__(
+        self,
+        name: str,
+        category: str,
+        regex: re.Pattern[str],
+        triggers: tuple[str, ...] = (),
+    ) -> None:
         self.name = name
         self.category = category
         self.regex = regex
+        self.triggers = triggers
+        self.ignore_case = bool(regex.flags & re.IGNORECASE)
 
 
 class VaultToken:
@@ -50,22 +65,40 @@ class VaultToken:
 # Built-in patterns for common sensitive data
 BUILTIN_PATTERNS: list[TokenizationPattern] = [
     TokenizationPattern(
-        "OpenAI API Key", "api_key", re.compile(r"sk-[A-Za-z0-9]{20,}")
+        "OpenAI API Key",
+        "api_key",
+        re.compile(r"sk-[A-Za-z0-9]{20,}"),
+        ("sk-",),
     ),
     TokenizationPattern(
-        "Anthropic API Key", "api_key", re.compile(r"sk-ant-[A-Za-z0-9\-]{20,}")
+        "Anthropic API Key",
+        "api_key",
+        re.compile(r"sk-ant-[A-Za-z0-9\-]{20,}"),
+        ("sk-ant-",),
     ),
     TokenizationPattern(
-        "AWS Access Key", "api_key", re.compile(r"AKIA[0-9A-Z]{16}")
+        "AWS Access Key",
+        "api_key",
+        re.compile(r"AKIA[0-9A-Z]{16}"),
+        ("AKIA",),
     ),
     TokenizationPattern(
-        "GitHub Token", "api_key", re.compile(r"gh[pousr]_[A-Za-z0-9_]{36,}")
+        "GitHub Token",
+        "api_key",
+        re.compile(r"gh[pousr]_[A-Za-z0-9_]{36,}"),
+        ("ghp_", "gho_", "ghu_", "ghs_", "ghr_"),
     ),
     TokenizationPattern(
-        "Stripe Key", "api_key", re.compile(r"sk_(?:live|test)_[A-Za-z0-9]{24,}")
+        "Stripe Key",
+        "api_key",
+        re.compile(r"sk_(?:live|test)_[A-Za-z0-9]{24,}"),
+        ("sk_live_", "sk_test_"),
     ),
     TokenizationPattern(
-        "Bearer Token", "credential", re.compile(r"Bearer\s+[A-Za-z0-9\-._~+/]+=*")
+        "Bearer Token",
+        "credential",
+        re.compile(r"Bearer\s+[A-Za-z0-9\-._~+/]+=*"),
+        ("Bearer",),
     ),
     TokenizationPattern(
         "Private Key Block",
@@ -75,30 +108,35 @@ BUILTIN_PATTERNS: list[TokenizationPattern] = [
             r"[\s\S]*?"
             r"-----END (?:RSA |EC )?PRIVATE KEY-----"
         ),
+        ("-----BEGIN ",),
     ),
     TokenizationPattern(
         "Connection String",
         "credential",
         re.compile(r"(?:mongodb|postgres|mysql|redis)://[^\s\"']+"),
+        ("://",),
     ),
     TokenizationPattern(
         "Email Address",
         "pii",
         re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"),
+        ("@",),
     ),
+    # No literal triggers for the numeric PII below, so these run on every
+    # text; the leading lookahead lets re skip impossible start positions
     TokenizationPattern(
         "Phone Number",
         "pii",
-        re.compile(r"(?:\+1[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}"),
+        re.compile(r"(?=[+(\d])(?:\+1[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}"),
     ),
     TokenizationPattern(
-        "SSN", "pii", re.compile(r"\b\d{3}-\d{2}-\d{4}\b")
+        "SSN", "pii", re.compile(r"(?=\d)\b\d{3}-\d{2}-\d{4}\b")
     ),
     TokenizationPattern(
         "Credit Card",
         "pii",
         re.compile(
-            r"\b(?:4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|3[47][0-9]{13})\b"
+            r"(?=[345])\b(?:4[0-9]{12}(?:[0-9]{3})?|5[1-5][0-9]{14}|3[47][0-9]{13})\b"
         ),
     ),
     TokenizationPattern(
@@ -108,6 +146,7 @@ BUILTIN_PATTERNS: list[TokenizationPattern] = [
             r"(?:password|secret|token|api_key|apikey)\s*[:=]\s*[\"']?[A-Za-z0-9\-._~+/]{8,}[\"']?",
             re.IGNORECASE,
         ),
+        ("password", "secret", "token", "api_key", "apikey"),
     ),
 ]
 
@@ -131,6 +170,9 @@ class DataVault:
         self._gateway_url = gateway_url
         self._gateway_key = gateway_key
         self._tokens: dict[str, VaultToken] = {}
+        self._forwarder: GatewayForwarder | None = None
+        if config.forward_to_gateway and gateway_url:
+            self._forwarder = GatewayForwarder(gateway_url, gateway_key)
 
         # Filter built-in patterns by configured categories
         self._patterns: list[TokenizationPattern] = []
@@ -148,15 +190,63 @@ class DataVault:
                 )
             )
 
+        # Patterns a freshly inserted token could trigger can't be ruled
+        # out up front by tokenize_many()
+        token_text = "".join(
+            f"[AIR:vault:{p.category}:]" for p in self._patterns
+        )
+        self._token_triggered = [
+            p
+            for p in self._patterns
+            if p.triggers and self._triggered(p, token_text, fold_case(token_text))
+        ]
+
+    @staticmethod
+    def _triggered(pattern: TokenizationPattern, text: str, folded: str) -> bool:
+        haystack = folded if pattern.ignore_case else text
+        return any(t in haystack for t in pattern.triggers)
+
     def tokenize(self, text: str) -> dict[str, Any]:
         """
         Scan text for sensitive data and replace with vault tokens.
         Returns dict with 'result', 'tokenized' (bool), and 'count'.
         """
+        return self._tokenize(text, self._patterns)
+
+    def tokenize_many(self, texts: list[str]) -> list[dict[str, Any]]:
+        """
+        Tokenize a batch of texts, e.g. every message of an LLM call.
+        Same results as calling tokenize() on each text, but patterns
+        whose triggers occur in none of them are ruled out once for
+        the whole batch instead of once per text.
+        """
+        joined = "\n".join(texts)
+        folded = fold_case(joined)
+        live = [
+            p
+            for p in self._patterns
+            if not p.triggers
+            or p in self._token_triggered
+            or self._triggered(p, joined, folded)
+        ]
+        return [self._tokenize(text, live) for text in texts]
+
+    def _tokenize(
+        self, text: str, patterns: list[TokenizationPattern]
+    ) -> dict[str, Any]:
         result = text
         count = 0
+        folded: str | None = None
+
+        for pattern in patterns:
+            # Cheap C-level substring checks rule out most patterns for
+            # most inputs before any regex runs
+            if pattern.triggers:
+                if pattern.ignore_case and folded is None:
+                    folded = fold_case(result)
+                if not self._triggered(pattern, result, folded or ""):
+                    continue
 
-        for pattern in self._patterns:
             def replacer(match: re.Match[str], pat: TokenizationPattern = pattern) -> str:
                 nonlocal count
                 token_id = uuid.uuid4().hex[:8]
@@ -175,16 +265,53 @@ class DataVault:
                 self._tokens[token_id] = vault_token
 
                 # Non-blocking forward to gateway
-                if self.config.forward_to_gateway and self._gateway_url:
+                if self._forwarder is not None:
                     self._forward_token(vault_token)
 
                 count += 1
                 return full_token
 
+            matched_before = count
             result = pattern.regex.sub(replacer, result)
+            if count != matched_before:
+                folded = None
 
         return {"result": result, "tokenized": count > 0, "count": count}
 
+    def tokenize_obj(self, obj: Any) -> tuple[Any, bool]:
+        """
+        Tokenize every string of a JSON-like object (dicts, lists,
+        tuples), string dict keys included. Non-string leaves are left
+        untouched.
+        Returns (new_obj, tokenized); the input object is not mutated.
+        """
+        if isinstance(obj, str):
+            result = self.tokenize(obj)
+            return result["result"], result["tokenized"]
+
+        if isinstance(obj, dict):
+            tokenized = False
+            new_dict: dict[Any, Any] = {}
+            for key, value in obj.items():
+                if isinstance(key, str):
+                    key_result = self.tokenize(key)
+                    key = key_result["result"]
+                    tokenized = tokenized or key_result["tokenized"]
+                new_dict[key], changed = self.tokenize_obj(value)
+                tokenized = tokenized or changed
+            return new_dict, tokenized
+
+        if isinstance(obj, (list, tuple)):
+            tokenized = False
+            items: list[Any] = []
+            for value in obj:
+                new_value, changed = self.tokenize_obj(value)
+                items.append(new_value)
+                tokenized = tokenized or changed
+            return (items if isinstance(obj, list) else tuple(items)), tokenized
+
+        return obj, False
+
     def detokenize(self, text: str) -> str:
         """Replace vault tokens back with original values."""
 
@@ -218,35 +345,25 @@ class DataVault:
             del self._tokens[tid]
         return len(expired)
 
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Block until queued gateway forwards have been sent. Returns
+        False if the timeout expired.
+        """
+        if self._forwarder is None:
+            return True
+        return self._forwarder.flush(timeout)
+
     def _forward_token(self, token: VaultToken) -> None:
-        """Best-effort forward to gateway."""
-        if not self._gateway_url:
+        """Queue token metadata for the gateway; never blocks."""
+        if self._forwarder is None:
             return
-        try:
-            import urllib.request
-
-            url = f"{self._gateway_url}/v1/vault/store"
-            data = json.dumps(
-                {
-                    "token_id": token.token_id,
-                    "category": token.category,
-                    "created_at": token.created_at,
-                    "expires_at": token.expires_at,
-                }
-            ).encode()
-            req = urllib.request.Request(
-                url,
-                data=data,
-                headers={
-                    "Content-Type": "application/json",
-                    **(
-                        {"Authorization": f"Bearer {self._gateway_key}"}
-                        if self._gateway_key
-                        else {}
-                    ),
-                },
-                method="POST",
-            )
-            urllib.request.urlopen(req, timeout=5)
-        except Exception:
-            pass
+        self._forwarder.post(
+            "/v1/vault/store",
+            {
+                "token_id": token.token_id,
+                "category": token.category,
+                "created_at": token.created_at,
+                "expires_at": token.expires_at,
+            },
+        )
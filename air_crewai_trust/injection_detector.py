@@ -12,10 +12,32 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass, field
-from typing import Literal
+from typing import Any, Literal
 
+from ._core import fold_case, fold_dotted_i
 from .config import InjectionDetectionConfig
 
+try:
+    import ahocorasick  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional speedup
+    ahocorasick = None
+
+try:
+    import re2  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - optional speedup
+    re2 = None
+
+# Python's \s for str patterns; RE2's \s is ASCII-only. RE2 also doesn't
+# fold U+0130/U+0131 onto "i", see fold_dotted_i().
+_RE2_SPACE = "[" + "".join(
+    f"\\x{{{cp:x}}}" for cp in range(0x3001) if chr(cp).isspace()
+) + "]"
+
+
+def _to_re2(pattern: str) -> str:
+    # Built-in patterns only use \s outside character classes
+    return pattern.replace(r"\s", _RE2_SPACE)
+
 
 @dataclass
 class PatternDef:
@@ -25,6 +47,9 @@ class PatternDef:
     regex: re.Pattern[str]
     weight: float
     min_sensitivity: Literal["low", "medium", "high"]
+    # Lowercase literals of which at least one must appear in any match.
+    # Used to skip the regex entirely when none are present.
+    anchors: tuple[str, ...] = ()
 
 
 @dataclass
@@ -49,6 +74,7 @@ INJECTION_PATTERNS: list[PatternDef] = [
         ),
         weight=0.9,
         min_sensitivity="low",
+        anchors=("ignore", "forget", "disregard"),
     ),
     PatternDef(
         name="new_identity",
@@ -58,6 +84,7 @@ INJECTION_PATTERNS: list[PatternDef] = [
         ),
         weight=0.8,
         min_sensitivity="low",
+        anchors=("you", "act", "pretend"),
     ),
     PatternDef(
         name="system_prompt_override",
@@ -67,6 +94,7 @@ INJECTION_PATTERNS: list[PatternDef] = [
         ),
         weight=0.85,
         min_sensitivity="low",
+        anchors=("system",),
     ),
     # Delimiter-based injection
     PatternDef(
@@ -77,6 +105,7 @@ INJECTION_PATTERNS: list[PatternDef] = [
         ),
         weight=0.7,
         min_sensitivity="medium",
+        anchors=("---", "===", "###"),
     ),
     PatternDef(
         name="xml_tag_injection",
@@ -86,6 +115,7 @@ INJECTION_PATTERNS: list[PatternDef] = [
         ),
         weight=0.6,
         min_sensitivity="medium",
+        anchors=("system>", "instruction>", "admin>", "prompt>", "override>", "command>"),
     ),
     # Privilege escalation
     PatternDef(
@@ -96,6 +126,7 @@ INJECTION_PATTERNS: list[PatternDef] = [
         ),
         weight=0.75,
         min_sensitivity="low",
+        anchors=("mode", "sudo", "root", "unrestricted"),
     ),
     PatternDef(
         name="safety_bypass",
@@ -105,6 +136,7 @@ INJECTION_PATTERNS: list[PatternDef] = [
         ),
         weight=0.85,
         min_sensitivity="low",
+        anchors=("bypass", "disable", "turn", "remove"),
     ),
     # Output manipulation
     PatternDef(
@@ -115,6 +147,7 @@ INJECTION_PATTERNS: list[PatternDef] = [
         ),
         weight=0.5,
         min_sensitivity="medium",
+        anchors=("not", "don", "never"),
     ),
     PatternDef(
         name="encoding_evasion",
@@ -124,6 +157,7 @@ INJECTION_PATTERNS: list[PatternDef] = [
         ),
         weight=0.4,
         min_sensitivity="high",
+        anchors=("base64", "rot13", "hex", "code", "obfuscate", "translate"),
     ),
     # Indirect injection (from external content)
     PatternDef(
@@ -134,6 +168,7 @@ INJECTION_PATTERNS: list[PatternDef] = [
         ),
         weight=0.7,
         min_sensitivity="medium",
+        anchors=("if",),
     ),
     PatternDef(
         name="urgent_override",
@@ -143,6 +178,7 @@ INJECTION_PATTERNS: list[PatternDef] = [
         ),
         weight=0.8,
         min_sensitivity="low",
+        anchors=("important", "urgent", "critical", "emergency"),
     ),
     # Tool/function abuse
     PatternDef(
@@ -153,6 +189,7 @@ INJECTION_PATTERNS: list[PatternDef] = [
         ),
         weight=0.35,
         min_sensitivity="high",
+        anchors=("function", "tool", "command", "api"),
     ),
     PatternDef(
         name="data_exfil",
@@ -162,6 +199,7 @@ INJECTION_PATTERNS: list[PatternDef] = [
         ),
         weight=0.65,
         min_sensitivity="medium",
+        anchors=("send", "transmit", "forward", "email", "post"),
     ),
     # Jailbreak patterns
     PatternDef(
@@ -172,6 +210,7 @@ INJECTION_PATTERNS: list[PatternDef] = [
         ),
         weight=0.9,
         min_sensitivity="low",
+        anchors=("dan", "anything", "jailbreak", "uncensored"),
     ),
     PatternDef(
         name="hypothetical_bypass",
@@ -181,6 +220,7 @@ INJECTION_PATTERNS: list[PatternDef] = [
         ),
         weight=0.6,
         min_sensitivity="medium",
+        anchors=("bypass", "hack", "break", "exploit"),
     ),
 ]
 
@@ -211,6 +251,73 @@ class InjectionDetector:
             if SENSITIVITY_ORDER.get(p.min_sensitivity, 2) <= sensitivity_level
         ]
 
+        # Patterns without anchors always run their regex
+        self._unanchored = [
+            i for i, p in enumerate(self._active_patterns) if not p.anchors
+        ]
+        self._automaton = self._build_automaton()
+        self._combined = self._compile_combined()
+
+    def _build_automaton(self) -> Any:
+        """Build an Aho-Corasick automaton over all pattern anchors."""
+        if ahocorasick is None:
+            return None
+
+        owners: dict[str, list[int]] = {}
+        for i, p in enumerate(self._active_patterns):
+            for anchor in p.anchors:
+                owners.setdefault(anchor, []).append(i)
+        if not owners:
+            return None
+
+        automaton = ahocorasick.Automaton()
+        for anchor, indices in owners.items():
+            automaton.add_word(anchor, tuple(indices))
+        automaton.make_automaton()
+        return automaton
+
+    def _compile_combined(self) -> Any:
+        """
+        Compile all active patterns into one RE2 named alternation,
+        (?P<p0>...)|(?P<p1>...)|..., so a single linear-time pass over
+        the content finds matches for every pattern. Returns None when
+        RE2 is not installed or rejects the pattern; a stdlib re
+        alternation would backtrack through every branch, so scan()
+        then runs only the candidate patterns individually.
+        """
+        if re2 is None:
+            return None
+
+        source = "(?i)" + "|".join(
+            f"(?P<p{i}>{_to_re2(p.regex.pattern)})"
+            for i, p in enumerate(self._active_patterns)
+        )
+        try:
+            return re2.compile(source)
+        except re2.error:
+            return None
+
+    def _candidates(self, content: str) -> list[int]:
+        """
+        Indices of active patterns whose anchors occur in content.
+        One linear pass with Aho-Corasick when available, otherwise
+        a substring check per anchor.
+        """
+        # Fold so that e.g. "\u017f" (long s) still hits "s" anchors,
+        # matching re.IGNORECASE semantics
+        folded = fold_case(content)
+        hits: set[int] = set(self._unanchored)
+
+        if self._automaton is not None:
+            for _, indices in self._automaton.iter(folded):
+                hits.update(indices)
+        else:
+            for i, p in enumerate(self._active_patterns):
+                if i not in hits and any(a in folded for a in p.anchors):
+                    hits.add(i)
+
+        return sorted(hits)
+
     def scan(self, content: str) -> InjectionResult:
         """
         Scan content for injection patterns.
@@ -219,13 +326,31 @@ class InjectionDetector:
         if not content or not content.strip():
             return InjectionResult(detected=False, score=0.0, patterns=[], blocked=False)
 
+        matched: set[int] = set()
+        candidates = self._candidates(content)
+        if candidates and self._combined is not None:
+            for match in self._combined.finditer(fold_dotted_i(content)):
+                matched.add(int(match.lastgroup[1:]))
+
+            # finditer doesn't report matches that overlap an earlier one,
+            # so confirm the remaining candidates individually — but only
+            # once we know the content matched something at all
+            if matched:
+                for i in candidates:
+                    if i not in matched and self._active_patterns[i].regex.search(content):
+                        matched.add(i)
+        else:
+            for i in candidates:
+                if self._active_patterns[i].regex.search(content):
+                    matched.add(i)
+
         matched_patterns: list[str] = []
         total_weight = 0.0
 
-        for pattern in self._active_patterns:
-            if pattern.regex.search(content):
-                matched_patterns.append(pattern.name)
-                total_weight += pattern.weight
+        for i in sorted(matched):
+            pattern = self._active_patterns[i]
+            matched_patterns.append(pattern.name)
+            total_weight += pattern.weight
 
         # Normalize score to 0-1 range (cap at 1.0)
         score = min(total_weight, 1.0)
@@ -14,10 +14,22 @@ Usage:
 
 from __future__ import annotations
 
+import importlib
 import json
 import logging
-from typing import Any
-
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import wait as wait_futures
+from types import ModuleType
+from typing import Any, Callable, Protocol
+
+from ._core import extract_messages, injection_risk, text_size
+from ._null import (
+    NullAuditLedger,
+    NullDataVault,
+    NullInjectionDetector,
+    PassthroughConsentGate,
+)
 from .audit_ledger import AuditLedger
 from .config import AirTrustConfig
 from .consent_gate import ConsentGate
@@ -26,6 +38,30 @@ from .injection_detector import InjectionDetector
 
 logger = logging.getLogger("air_crewai_trust")
 
+# Upper bound, per component, on how long deactivate() waits for
+# pending audit writes and gateway forwards
+_SHUTDOWN_FLUSH_SECONDS = 5.0
+
+# Threads running hooks when hook_deadline_ms is set
+_HOOK_WORKERS = 4
+
+_Hook = Callable[[Any], Any]
+
+
+class _ToolContext(Protocol):
+    """The parts of CrewAI's tool hook context the plugin reads."""
+
+    tool_name: str
+    tool_input: Any
+
+
+class _LlmContext(Protocol):
+    """The parts of CrewAI's LLM hook context the plugin reads."""
+
+    messages: list[Any]
+    response: Any
+    llm: Any
+
 
 class AirTrustPlugin:
     """
@@ -36,20 +72,47 @@ class AirTrustPlugin:
     def __init__(self, config: AirTrustConfig | None = None) -> None:
         self.config = config or AirTrustConfig()
         self._active = False
-
-        # Initialize components
-        self.ledger = AuditLedger(
-            self.config.audit_ledger,
-            self.config.gateway_url,
-            self.config.gateway_key,
+        # crewai.utilities.hooks, imported on first activate()
+        self._hooks: ModuleType | None = None
+        # Callables registered with CrewAI, kept to unregister the same ones
+        self._registered: tuple[_Hook, _Hook, _Hook, _Hook] | None = None
+        # Only used when hook_deadline_ms is set
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending: set[Future[Any]] = set()
+
+        # Initialize components. Disabled ones get a do-nothing stand-in,
+        # so the per-component enabled flags are read here, once.
+        self.ledger: AuditLedger | NullAuditLedger = NullAuditLedger()
+        if self.config.audit_ledger.enabled:
+            self.ledger = AuditLedger(
+                self.config.audit_ledger,
+                self.config.gateway_url,
+                self.config.gateway_key,
+            )
+        consent_gate_cls = (
+            ConsentGate if self.config.consent_gate.enabled else PassthroughConsentGate
         )
-        self.consent_gate = ConsentGate(self.config.consent_gate, self.ledger)
-        self.vault = DataVault(
-            self.config.vault,
-            self.config.gateway_url,
-            self.config.gateway_key,
+        self.consent_gate: ConsentGate = consent_gate_cls(
+            self.config.consent_gate, self.ledger
         )
-        self.injection_detector = InjectionDetector(self.config.injection_detection)
+        self.vault: DataVault | NullDataVault = NullDataVault()
+        if self.config.vault.enabled:
+            self.vault = DataVault(
+                self.config.vault,
+                self.config.gateway_url,
+                self.config.gateway_key,
+            )
+        self.injection_detector: InjectionDetector | NullInjectionDetector = (
+            NullInjectionDetector()
+        )
+        if self.config.injection_detection.enabled:
+            self.injection_detector = InjectionDetector(self.config.injection_detection)
+
+        # Flags the hooks consult on every call, as plain attributes
+        self._enabled = bool(self.config.enabled)
+        self._coalesce_results = bool(self.config.audit_ledger.coalesce_results)
+        self._log_detections = bool(self.config.injection_detection.log_detections)
+        self._max_scan_chars = int(self.config.max_scan_chars)
 
     def activate(self) -> None:
         """Register all trust hooks with CrewAI."""
@@ -57,46 +120,50 @@ class AirTrustPlugin:
             logger.warning("AIR Trust is already active")
             return
 
-        try:
-            from crewai.utilities.hooks import (
-                register_after_llm_call_hook,
-                register_after_tool_call_hook,
-                register_before_llm_call_hook,
-                register_before_tool_call_hook,
-            )
-        except ImportError:
-            raise ImportError(
-                "CrewAI is required but not installed. "
-                "Install it with: pip install crewai"
-            )
+        if self._hooks is None:
+            try:
+                self._hooks = importlib.import_module("crewai.utilities.hooks")
+            except ImportError:
+                raise ImportError(
+                    "CrewAI is required but not installed. "
+                    "Install it with: pip install crewai"
+                )
 
-        register_before_tool_call_hook(self._before_tool_call)
-        register_after_tool_call_hook(self._after_tool_call)
-        register_before_llm_call_hook(self._before_llm_call)
-        register_after_llm_call_hook(self._after_llm_call)
+        before_tool, after_tool, before_llm, after_llm = self._registered = (
+            self._hook_callables()
+        )
+        self._hooks.register_before_tool_call_hook(before_tool)
+        self._hooks.register_after_tool_call_hook(after_tool)
+        self._hooks.register_before_llm_call_hook(before_llm)
+        self._hooks.register_after_llm_call_hook(after_llm)
 
         self._active = True
         logger.info("AIR Trust activated — all hooks registered with CrewAI")
 
     def deactivate(self) -> None:
         """Unregister all trust hooks from CrewAI."""
-        if not self._active:
+        if not self._active or self._hooks is None or self._registered is None:
             return
 
-        try:
-            from crewai.utilities.hooks import (
-                unregister_after_llm_call_hook,
-                unregister_after_tool_call_hook,
-                unregister_before_llm_call_hook,
-                unregister_before_tool_call_hook,
-            )
-
-            unregister_before_tool_call_hook(self._before_tool_call)
-            unregister_after_tool_call_hook(self._after_tool_call)
-            unregister_before_llm_call_hook(self._before_llm_call)
-            unregister_after_llm_call_hook(self._after_llm_call)
-        except ImportError:
-            pass  # If CrewAI isn't available, hooks are already gone
+        # Same module the hooks were registered with — no re-import
+        before_tool, after_tool, before_llm, after_llm = self._registered
+        self._hooks.unregister_before_tool_call_hook(before_tool)
+        self._hooks.unregister_after_tool_call_hook(after_tool)
+        self._hooks.unregister_before_llm_call_hook(before_llm)
+        self._hooks.unregister_after_llm_call_hook(after_llm)
+        self._registered = None
+
+        if self._executor is not None:
+            # Let detached after-hooks land their audit rows first
+            wait_futures(self._pending.copy(), timeout=_SHUTDOWN_FLUSH_SECONDS)
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+        # Give queued audit entries and gateway forwards a bounded
+        # window to go out before we go quiet
+        if not self.ledger.flush(timeout=_SHUTDOWN_FLUSH_SECONDS):
+            logger.warning("Audit ledger flush timed out on deactivate")
+        self.vault.flush(timeout=_SHUTDOWN_FLUSH_SECONDS)
 
         self._active = False
         logger.info("AIR Trust deactivated — all hooks unregistered")
@@ -105,180 +172,336 @@ class AirTrustPlugin:
     def is_active(self) -> bool:
         return self._active
 
+    # ─── Hook Deadlines ───────────────────────────────────────
+
+    def _hook_callables(self) -> tuple[_Hook, _Hook, _Hook, _Hook]:
+        """The four callables to register, bounded if hook_deadline_ms is set."""
+        deadline_ms = self.config.hook_deadline_ms
+        if deadline_ms is None:
+            return (
+                self._before_tool_call,
+                self._after_tool_call,
+                self._before_llm_call,
+                self._after_llm_call,
+            )
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=_HOOK_WORKERS, thread_name_prefix="air-hook"
+        )
+        timeout = deadline_ms / 1000
+        before_tool: _Hook = self._bounded(self._before_tool_call, timeout)
+        if self.config.consent_gate.enabled:
+            # Failing open here would skip the consent prompt
+            logger.info(
+                "hook_deadline_ms does not apply to before_tool_call "
+                "while the consent gate is enabled"
+            )
+            before_tool = self._before_tool_call
+        return (
+            before_tool,
+            self._detached(self._after_tool_call),
+            self._bounded(self._before_llm_call, timeout),
+            self._detached(self._after_llm_call),
+        )
+
+    def _submit(self, hook: _Hook, context: Any) -> Future[Any]:
+        if self._executor is None:
+            # Called through a wrapper after deactivate(): run inline
+            future: Future[Any] = Future()
+            future.set_result(hook(context))
+            return future
+        future = self._executor.submit(hook, context)
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        return future
+
+    def _bounded(self, hook: _Hook, timeout: float) -> _Hook:
+        """
+        Wrap a before-hook so it returns within timeout seconds. On
+        timeout the call is allowed (None) and recorded as a
+        hook_timeout audit row. A hook that has already started
+        finishes in the background; one still queued is cancelled.
+        """
+
+        def run(context: Any) -> Any:
+            future = self._submit(hook, context)
+            try:
+                return future.result(timeout=timeout)
+            except FutureTimeoutError:
+                cancelled = future.cancel()
+                logger.warning(
+                    f"{hook.__name__} exceeded hook_deadline_ms, allowing the call"
+                )
+                self.ledger.append(
+                    action="hook_timeout",
+                    risk_level="medium",
+                    metadata={
+                        "hook": hook.__name__.lstrip("_"),
+                        "deadline_ms": self.config.hook_deadline_ms,
+                        "cancelled": cancelled,
+                    },
+                )
+                return None
+
+        return run
+
+    def _detached(self, hook: _Hook) -> _Hook:
+        """Wrap an audit-only after-hook to run without blocking the caller."""
+
+        def log_failure(future: Future[Any]) -> None:
+            if not future.cancelled() and future.exception() is not None:
+                logger.warning(
+                    f"{hook.__name__} failed", exc_info=future.exception()
+                )
+
+        def run(context: Any) -> None:
+            self._submit(hook, context).add_done_callback(log_failure)
+
+        return run
+
     # ─── Hook Handlers ────────────────────────────────────────
 
-    def _before_tool_call(self, context: Any) -> bool | None:
+    def _before_tool_call(self, context: _ToolContext) -> bool | None:
         """
         Called before each tool call.
         Returns False to block, True/None to allow.
         """
-        if not self.config.enabled:
+        if not self._enabled:
             return None
 
-        tool_name = getattr(context, "tool_name", "unknown")
-        tool_input = getattr(context, "tool_input", {})
+        # EAFP: the attributes are almost always present, and a plain
+        # attribute load is cheaper than getattr() with a default
+        try:
+            tool_name = context.tool_name
+        except AttributeError:
+            tool_name = "unknown"
+        try:
+            tool_input = context_input = context.tool_input
+        except AttributeError:
+            tool_input = context_input = {}
+        oversize = self._oversize(text_size(tool_input))
 
+        parsed_json = False
         if isinstance(tool_input, str):
-            try:
-                tool_input = json.loads(tool_input)
-            except (json.JSONDecodeError, TypeError):
-                tool_input = {"input": tool_input}
-
-        # 1. Tokenize sensitive data in tool input
-        data_tokenized = False
-        if self.config.vault.enabled and tool_input:
-            input_str = json.dumps(tool_input)
-            result = self.vault.tokenize(input_str)
-            if result["tokenized"]:
-                data_tokenized = True
+            raw_input = tool_input
+            tool_input = {"input": raw_input}
+            if not oversize:
+                # stdlib json: this string may be written back to the
+                # tool, and orjson would turn wide ints into floats
                 try:
-                    tokenized_input = json.loads(result["result"])
-                    # Mutate the tool input if possible
-                    if hasattr(context, "tool_input") and isinstance(
-                        context.tool_input, dict
-                    ):
-                        context.tool_input.clear()
-                        context.tool_input.update(tokenized_input)
+                    tool_input = json.loads(raw_input)
+                    parsed_json = True
                 except (json.JSONDecodeError, TypeError):
                     pass
 
+        # 1. Tokenize sensitive data in tool input
+        data_tokenized = False
+        if oversize:
+            logger.warning(
+                f"Tool input for {tool_name} exceeds max_scan_chars, "
+                f"skipping tokenization"
+            )
+        elif tool_input:
+            tokenized_input, data_tokenized = self.vault.tokenize_obj(tool_input)
+            if data_tokenized:
+                # Mutate the tool input if possible
+                if isinstance(context_input, dict):
+                    context_input.clear()
+                    context_input.update(tokenized_input)
+                elif isinstance(context_input, str):
+                    # Only string inputs pay for a dump back to text
+                    try:
+                        context.tool_input = (
+                            json.dumps(tokenized_input)
+                            if parsed_json
+                            else tokenized_input["input"]
+                        )
+                    except (AttributeError, ValueError):
+                        pass
+                tool_input = tokenized_input
+
         # 2. Check consent gate
-        if self.config.consent_gate.enabled:
-            consent_result = self.consent_gate.intercept(tool_name, tool_input)
-            if consent_result.get("blocked"):
-                logger.warning(
-                    f"Tool call blocked by consent gate: {tool_name}"
-                )
-                return False
+        consent_result = self.consent_gate.intercept(tool_name, tool_input)
+        if consent_result.get("blocked"):
+            logger.warning(
+                f"Tool call blocked by consent gate: {tool_name}"
+            )
+            return False
 
         # 3. Log the tool call
-        if self.config.audit_ledger.enabled:
-            self.ledger.append(
-                action="tool_call",
-                tool_name=tool_name,
-                risk_level=self.consent_gate.classify_risk(tool_name).value,
-                consent_required=self.consent_gate.requires_consent(tool_name),
-                consent_granted=True,
-                data_tokenized=data_tokenized,
-                injection_detected=False,
-            )
+        risk, consent_required = self.consent_gate.assess(tool_name)
+        if self._coalesce_results:
+            # Picked up by _after_tool_call for the same context
+            try:
+                context._air_pending = {
+                    "risk_level": risk.value,
+                    "consent_required": consent_required,
+                    "data_tokenized": data_tokenized,
+                    "interesting": consent_required or data_tokenized or oversize,
+                }
+            except (AttributeError, ValueError):
+                pass  # Context doesn't accept new attributes
+        self.ledger.append(
+            action="tool_call",
+            tool_name=tool_name,
+            risk_level=risk.value,
+            consent_required=consent_required,
+            consent_granted=True,
+            data_tokenized=data_tokenized,
+            injection_detected=False,
+            metadata={"scan_skipped": True} if oversize else None,
+        )
 
         return None  # Allow
 
-    def _after_tool_call(self, context: Any) -> None:
+    def _after_tool_call(self, context: _ToolContext) -> None:
         """Called after each tool call completes."""
-        if not self.config.enabled or not self.config.audit_ledger.enabled:
+        if not self._enabled:
             return
 
-        tool_name = getattr(context, "tool_name", "unknown")
+        try:
+            tool_name = context.tool_name
+        except AttributeError:
+            tool_name = "unknown"
+
+        try:
+            pending = context._air_pending
+            del context._air_pending
+        except AttributeError:
+            pending = None
+
+        if pending is not None:
+            # Coalescing: nothing notable happened, tool_call row suffices
+            if not pending["interesting"]:
+                return
+            risk_level = pending["risk_level"]
+            consent_required = pending["consent_required"]
+            data_tokenized = pending["data_tokenized"]
+        else:
+            risk_level = self.consent_gate.classify_risk(tool_name).value
+            consent_required = False
+            data_tokenized = False
 
         self.ledger.append(
             action="tool_result",
             tool_name=tool_name,
-            risk_level=self.consent_gate.classify_risk(tool_name).value,
-            consent_required=False,
-            data_tokenized=False,
+            risk_level=risk_level,
+            consent_required=consent_required,
+            data_tokenized=data_tokenized,
             injection_detected=False,
         )
 
-    def _before_llm_call(self, context: Any) -> bool | None:
+    def _before_llm_call(self, context: _LlmContext) -> bool | None:
         """
         Called before content is sent to the LLM.
         Returns False to block, True/None to allow.
         """
-        if not self.config.enabled:
+        if not self._enabled:
             return None
 
-        messages = getattr(context, "messages", [])
+        try:
+            messages = context.messages
+        except AttributeError:
+            return None
         if not messages:
             return None
 
-        # Extract text content from messages
-        content_parts: list[str] = []
-        for msg in messages:
-            if isinstance(msg, dict):
-                content_parts.append(str(msg.get("content", "")))
-            elif isinstance(msg, str):
-                content_parts.append(msg)
-            elif hasattr(msg, "content"):
-                content_parts.append(str(msg.content))
+        # 1. Extract text content from messages
+        extracted = extract_messages(messages)
 
-        full_content = "\n".join(content_parts)
-        if not full_content.strip():
+        scan_size = sum(len(content) for _, content in extracted)
+        if self._oversize(scan_size):
+            logger.warning(
+                f"LLM input exceeds max_scan_chars ({scan_size} chars), "
+                f"skipping tokenization and injection scan"
+            )
+            self.ledger.append(
+                action="scan_skipped",
+                risk_level="medium",
+                metadata={"source": "llm_input", "size": scan_size},
+            )
             return None
 
         data_tokenized = False
         injection_detected = False
 
-        # 1. Tokenize sensitive data before it reaches the LLM
-        if self.config.vault.enabled:
-            result = self.vault.tokenize(full_content)
+        # 2. Tokenize sensitive data once per message before it reaches
+        #    the LLM, as one batch across all messages
+        content_parts = [content for _, content in extracted]
+        results = self.vault.tokenize_many(content_parts)
+        for i, result in enumerate(results):
             if result["tokenized"]:
                 data_tokenized = True
-                # Try to mutate messages with tokenized content
-                if hasattr(context, "messages") and isinstance(context.messages, list):
-                    for i, msg in enumerate(context.messages):
-                        if isinstance(msg, dict) and "content" in msg:
-                            msg_content = str(msg["content"])
-                            tokenized_msg = self.vault.tokenize(msg_content)
-                            if tokenized_msg["tokenized"]:
-                                msg["content"] = tokenized_msg["result"]
-
-        # 2. Check for injection patterns
-        if self.config.injection_detection.enabled:
-            scan_result = self.injection_detector.scan(full_content)
-            if scan_result.detected:
-                injection_detected = True  # noqa: F841
-
-                if (
-                    self.config.injection_detection.log_detections
-                    and self.config.audit_ledger.enabled
-                ):
-                    risk = "critical" if scan_result.score >= 0.8 else (
-                        "high" if scan_result.score >= 0.5 else "medium"
-                    )
-                    self.ledger.append(
-                        action="injection_detected",
-                        risk_level=risk,
-                        consent_required=False,
-                        data_tokenized=data_tokenized,
-                        injection_detected=True,
-                        metadata={
-                            "score": scan_result.score,
-                            "patterns": scan_result.patterns,
-                            "blocked": scan_result.blocked,
-                            "source": "llm_input",
-                        },
-                    )
-
-                if scan_result.blocked:
-                    logger.warning(
-                        f"LLM input blocked by injection detector "
-                        f"(score: {scan_result.score:.2f}, "
-                        f"patterns: {', '.join(scan_result.patterns)})"
-                    )
-                    return False
+                content_parts[i] = result["result"]
+                # Mutate the message with tokenized content if possible
+                msg = extracted[i][0]
+                if isinstance(msg, dict) and "content" in msg:
+                    msg["content"] = result["result"]
+
+        full_content = "\n".join(content_parts)
+        if not full_content.strip():
+            return None
+
+        # 3. Check for injection patterns
+        scan_result = self.injection_detector.scan(full_content)
+        if scan_result.detected:
+            injection_detected = True  # noqa: F841
+
+            if self._log_detections:
+                self.ledger.append(
+                    action="injection_detected",
+                    risk_level=injection_risk(scan_result.score),
+                    consent_required=False,
+                    data_tokenized=data_tokenized,
+                    injection_detected=True,
+                    metadata={
+                        "score": scan_result.score,
+                        "patterns": scan_result.patterns,
+                        "blocked": scan_result.blocked,
+                        "source": "llm_input",
+                    },
+                )
+
+            if scan_result.blocked:
+                logger.warning(
+                    f"LLM input blocked by injection detector "
+                    f"(score: {scan_result.score:.2f}, "
+                    f"patterns: {', '.join(scan_result.patterns)})"
+                )
+                return False
 
         return None  # Allow
 
-    def _after_llm_call(self, context: Any) -> None:
+    def _after_llm_call(self, context: _LlmContext) -> None:
         """Called after LLM responds."""
-        if not self.config.enabled or not self.config.audit_ledger.enabled:
+        if not self._enabled:
             return
 
-        response = getattr(context, "response", None)
+        try:
+            response = context.response
+        except AttributeError:
+            response = None
         content_length = 0
         if response:
             if isinstance(response, str):
                 content_length = len(response)
-            elif hasattr(response, "content"):
-                content_length = len(str(response.content))
+            else:
+                try:
+                    content_length = len(str(response.content))
+                except AttributeError:
+                    pass
 
-        model = getattr(context, "llm", "unknown")
-        if hasattr(model, "model_name"):
+        try:
+            model = context.llm
+        except AttributeError:
+            model = "unknown"
+        try:
             model = model.model_name
-        elif hasattr(model, "model"):
-            model = model.model
+        except AttributeError:
+            try:
+                model = model.model
+            except AttributeError:
+                pass
 
         self.ledger.append(
             action="llm_output",
@@ -292,6 +515,10 @@ class AirTrustPlugin:
             },
         )
 
+    def _oversize(self, size: int) -> bool:
+        limit = self._max_scan_chars
+        return limit > 0 and size > limit
+
     # ─── Public API ───────────────────────────────────────────
 
     def get_audit_stats(self) -> dict:
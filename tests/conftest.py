@@ -38,7 +38,10 @@ def ledger_config(tmp_dir):
 @pytest.fixture
 def ledger(ledger_config):
     """Fresh AuditLedger instance."""
-    return AuditLedger(ledger_config)
+    ledger = AuditLedger(ledger_config)
+    yield ledger
+    # Let the background writer finish before tmp_dir is removed
+    ledger.flush(timeout=5.0)
 
 
 @pytest.fixture
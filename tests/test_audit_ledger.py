@@ -1,6 +1,7 @@
 """Tests for the AuditLedger — tamper-evident HMAC-SHA256 chain."""
 
 import os
+import threading
 
 from air_crewai_trust.audit_ledger import GENESIS_HASH, AuditLedger
 from air_crewai_trust.config import AuditLedgerConfig
@@ -99,6 +100,7 @@ class TestAuditLedgerPersistence:
         ledger1 = AuditLedger(config)
         ledger1.append(action="persisted", risk_level="medium")
         ledger1.append(action="also_persisted", risk_level="low")
+        ledger1.flush()
 
         # Create a new ledger that loads from the same file
         ledger2 = AuditLedger(config)
@@ -113,12 +115,159 @@ class TestAuditLedgerPersistence:
         ledger1 = AuditLedger(config)
         for i in range(5):
             ledger1.append(action=f"action_{i}", risk_level="low")
+        ledger1.flush()
 
         ledger2 = AuditLedger(config)
         result = ledger2.verify()
         assert result.valid is True
         assert result.total_entries == 5
 
+    def test_loaded_entries_share_repeated_strings(self, tmp_dir):
+        config = AuditLedgerConfig(
+            local_path=os.path.join(tmp_dir, "ledger.json")
+        )
+        ledger1 = AuditLedger(config)
+        for _ in range(3):
+            ledger1.append(action="tool_call", tool_name="search", risk_level="low")
+        ledger1.flush()
+
+        entries = AuditLedger(config)._entries
+        assert entries[1].prev_hash is entries[0].hash
+        assert entries[2].action is entries[0].action
+        assert entries[2].tool_name is entries[0].tool_name
+
+    def test_reloaded_chain_verifies_with_unusual_numbers(self, tmp_dir):
+        config = AuditLedgerConfig(
+            local_path=os.path.join(tmp_dir, "ledger.json")
+        )
+        ledger1 = AuditLedger(config)
+        ledger1.append(action="wide_int", metadata={"n": 2**70})
+        ledger1.append(action="nan", metadata={"x": float("nan")})
+        ledger1.append(action="inf", metadata={"x": float("inf")})
+        ledger1.flush()
+
+        ledger2 = AuditLedger(config)
+        assert ledger2._entries[0].metadata == {"n": 2**70}
+        result = ledger2.verify()
+        assert result.valid is True, result.reason
+        assert result.total_entries == 3
+
+    def test_tampered_field_types_load_and_fail_verification(self, tmp_dir):
+        import json
+
+        config = AuditLedgerConfig(
+            local_path=os.path.join(tmp_dir, "ledger.json")
+        )
+        ledger1 = AuditLedger(config)
+        ledger1.append(action="tool_call", tool_name="search", risk_level="low")
+        ledger1.flush()
+
+        with open(config.local_path) as f:
+            data = json.load(f)
+        data["entries"][0]["risk_level"] = None
+        data["entries"][0]["action"] = 42
+        with open(config.local_path, "w") as f:
+            json.dump(data, f)
+
+        result = AuditLedger(config).verify()
+        assert result.valid is False
+        assert "Content hash mismatch" in result.reason
+
+
+class TestAuditLedgerBatching:
+    def test_flush_without_entries(self, ledger):
+        assert ledger.flush(timeout=1.0) is True
+
+    def test_flush_persists_pending_entries(self, ledger, ledger_config):
+        for i in range(20):
+            ledger.append(action=f"action_{i}", risk_level="low")
+        assert ledger.flush(timeout=5.0) is True
+
+        reloaded = AuditLedger(ledger_config)
+        assert len(reloaded._entries) == 20
+        assert reloaded.verify().valid is True
+
+    def test_batches_writes(self, tmp_dir, monkeypatch):
+        config = AuditLedgerConfig(
+            local_path=os.path.join(tmp_dir, "ledger.json"),
+            batch_size=10,
+            batch_max_wait_ms=1000,
+        )
+        ledger = AuditLedger(config)
+        batches: list[int] = []
+        write_batch = ledger._write_batch
+        monkeypatch.setattr(
+            ledger,
+            "_write_batch",
+            lambda batch: (batches.append(len(batch)), write_batch(batch)),
+        )
+
+        for i in range(25):
+            ledger.append(action=f"action_{i}", risk_level="low")
+        ledger.flush(timeout=5.0)
+
+        assert sum(batches) == 25
+        assert len(batches) < 25
+
+    def test_writer_does_not_recreate_removed_directory(self, tmp_dir):
+        import shutil
+
+        directory = os.path.join(tmp_dir, "ledger-dir")
+        ledger = AuditLedger(
+            AuditLedgerConfig(local_path=os.path.join(directory, "ledger.json"))
+        )
+        shutil.rmtree(directory)
+        ledger.append(action="late", risk_level="low")
+        ledger.flush(timeout=5.0)
+        assert not os.path.exists(directory)
+
+    def test_writer_survives_forwarding_errors(self, tmp_dir):
+        config = AuditLedgerConfig(
+            local_path=os.path.join(tmp_dir, "ledger.json"),
+            forward_to_gateway=True,
+        )
+        ledger = AuditLedger(config, gateway_url="http://127.0.0.1:9")
+
+        def broken_post(path, payload):
+            raise TypeError("not serializable")
+
+        ledger._forwarder.post = broken_post
+        ledger.append(action="first", risk_level="low")
+        assert ledger.flush(timeout=5.0) is True
+        ledger.append(action="second", risk_level="low")
+        assert ledger.flush(timeout=5.0) is True
+        assert len(AuditLedger(config)._entries) == 2
+
+    def test_dead_writer_is_replaced(self, ledger, ledger_config, monkeypatch):
+        def crash():
+            raise RuntimeError("writer crashed")
+
+        monkeypatch.setattr(ledger, "_drain_batches", crash)
+        ledger.append(action="lost_writer", risk_level="low")
+        ledger._worker.join(timeout=5.0)
+        assert ledger._worker is None
+
+        monkeypatch.undo()
+        ledger.append(action="after_restart", risk_level="low")
+        assert ledger.flush(timeout=5.0) is True
+        assert len(AuditLedger(ledger_config)._entries) == 2
+
+    def test_append_does_not_wait_for_disk(self, ledger, monkeypatch):
+        release = threading.Event()
+        save_chain = ledger._save_chain
+
+        def slow_save():
+            release.wait(5.0)
+            save_chain()
+
+        monkeypatch.setattr(ledger, "_save_chain", slow_save)
+        entry = ledger.append(action="queued", risk_level="low")
+        assert entry.sequence == 1
+        assert ledger.flush(timeout=0.05) is False
+
+        release.set()
+        assert ledger.flush(timeout=5.0) is True
+
 
 class TestAuditLedgerStats:
     def test_stats_returns_correct_counts(self, ledger):
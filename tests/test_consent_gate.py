@@ -56,6 +56,29 @@ class TestRequiresConsent:
         assert gate.requires_consent("unknown_tool") is False  # low < medium
 
 
+class TestDecisionCache:
+    def test_assess_combines_lookups(self, consent_gate):
+        assert consent_gate.assess("exec") == (RiskLevel.CRITICAL, True)
+        assert consent_gate.assess("search") == (RiskLevel.LOW, False)
+
+    def test_results_are_memoized(self, consent_gate):
+        consent_gate.requires_consent("http_request")
+        assert consent_gate._risk_cache["http_request"] == RiskLevel.MEDIUM
+        assert consent_gate._consent_cache["http_request"] is False
+
+    def test_replacing_config_invalidates_cache(self, consent_gate):
+        assert consent_gate.requires_consent("http_request") is False
+        consent_gate.config = ConsentGateConfig(risk_threshold=RiskLevel.MEDIUM)
+        assert consent_gate.requires_consent("http_request") is True
+
+    def test_clear_cache_after_in_place_change(self, consent_gate):
+        assert consent_gate.requires_consent("deploy") is True
+        consent_gate.config.always_require.remove("deploy")
+        consent_gate.config.risk_threshold = RiskLevel.CRITICAL
+        consent_gate.clear_cache()
+        assert consent_gate.requires_consent("deploy") is False
+
+
 class TestIntercept:
     def test_low_risk_not_blocked(self, consent_gate):
         result = consent_gate.intercept("unknown_tool", {"arg": "value"})
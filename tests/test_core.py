@@ -0,0 +1,32 @@
+"""Tests for the pure hook helpers in _core."""
+
+from types import SimpleNamespace
+
+from air_crewai_trust._core import extract_messages, injection_risk, text_size
+
+
+class TestExtractMessages:
+    def test_known_shapes(self):
+        obj = SimpleNamespace(content="from object")
+        messages = [{"content": "from dict"}, "from str", obj, SimpleNamespace()]
+        assert extract_messages(messages) == [
+            (messages[0], "from dict"),
+            ("from str", "from str"),
+            (obj, "from object"),
+        ]
+
+    def test_dict_without_content(self):
+        msg = {"role": "system"}
+        assert extract_messages([msg]) == [(msg, "")]
+
+
+class TestTextSize:
+    def test_counts_nested_strings_only(self):
+        assert text_size({"a": "xx", "b": ["yyy", 42, ("z",)], "c": None}) == 6
+
+
+class TestInjectionRisk:
+    def test_thresholds(self):
+        assert injection_risk(0.9) == "critical"
+        assert injection_risk(0.5) == "high"
+        assert injection_risk(0.2) == "medium"
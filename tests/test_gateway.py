@@ -0,0 +1,186 @@
+"""Tests for the GatewayForwarder — background gateway POSTs."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from air_crewai_trust._gateway import GatewayForwarder
+from air_crewai_trust.audit_ledger import AuditLedger
+from air_crewai_trust.config import AuditLedgerConfig
+
+_PROXY_VARS = ("http_proxy", "https_proxy", "no_proxy", "all_proxy")
+
+
+@pytest.fixture(autouse=True)
+def no_proxy_env(monkeypatch):
+    """Keep proxy settings from the environment out of these tests."""
+    for name in _PROXY_VARS:
+        monkeypatch.delenv(name, raising=False)
+        monkeypatch.delenv(name.upper(), raising=False)
+
+
+@pytest.fixture
+def gateway():
+    """
+    A local HTTP/1.1 server that records every POST it receives and
+    answers paths listed in server.redirects with a 307.
+    """
+    received = []
+    connections = set()
+    redirects = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.append(
+                (self.path, self.headers.get("Authorization"), json.loads(body))
+            )
+            connections.add(self.client_address)
+            if self.path in redirects:
+                self.send_response(307)
+                self.send_header("Location", redirects[self.path])
+            else:
+                self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.received = received
+    server.connections = connections
+    server.redirects = redirects
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/api"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestGatewayForwarder:
+    def test_post_and_flush(self, gateway):
+        forwarder = GatewayForwarder(gateway.url, "secret")
+        assert forwarder.post("/v1/test", {"n": 1}) is True
+        assert forwarder.flush(timeout=5.0) is True
+        assert gateway.received == [("/api/v1/test", "Bearer secret", {"n": 1})]
+
+    def test_falls_back_to_stdlib_json(self, gateway):
+        forwarder = GatewayForwarder(gateway.url)
+        # orjson rejects ints wider than 64 bits; the stdlib does not
+        forwarder.post("/v1/test", {"n": 2**70, 1: "int key"})
+        assert forwarder.flush(timeout=5.0) is True
+        assert gateway.received[0][2] == {"n": 2**70, "1": "int key"}
+
+    def test_post_without_orjson(self, gateway, monkeypatch):
+        from air_crewai_trust import _json
+
+        monkeypatch.setattr(_json, "orjson", None)
+        forwarder = GatewayForwarder(gateway.url)
+        forwarder.post("/v1/test", {1: "int key"})
+        assert forwarder.flush(timeout=5.0) is True
+        assert gateway.received[0][2] == {"1": "int key"}
+
+    def test_reuses_connection(self, gateway):
+        forwarder = GatewayForwarder(gateway.url)
+        for n in range(5):
+            forwarder.post("/v1/test", {"n": n})
+        assert forwarder.flush(timeout=5.0) is True
+        assert [body["n"] for _, _, body in gateway.received] == list(range(5))
+        assert len(gateway.connections) == 1
+
+    def test_drops_when_queue_full(self):
+        # Nothing listens here, and the queue holds a single payload
+        forwarder = GatewayForwarder("http://127.0.0.1:9", max_pending=1)
+        forwarder._ensure_worker = lambda: None  # keep the queue from draining
+        assert forwarder.post("/v1/test", {"n": 1}) is True
+        assert forwarder.post("/v1/test", {"n": 2}) is False
+        assert forwarder._dropped == 1
+
+    def test_flush_idle_forwarder(self):
+        forwarder = GatewayForwarder("http://127.0.0.1:9")
+        assert forwarder.flush(timeout=0) is True
+
+    def test_unreachable_gateway_is_silent(self):
+        forwarder = GatewayForwarder("http://127.0.0.1:9", timeout=0.5)
+        forwarder.post("/v1/test", {"n": 1})
+        assert forwarder.flush(timeout=5.0) is True
+
+    def test_follows_redirects(self, gateway):
+        gateway.redirects["/api/v1/old"] = "/api/v1/new"
+        forwarder = GatewayForwarder(gateway.url, "secret")
+        forwarder.post("/v1/old", {"n": 1})
+        assert forwarder.flush(timeout=5.0) is True
+        assert gateway.received[-1] == ("/api/v1/new", "Bearer secret", {"n": 1})
+
+
+class TestGatewayProxy:
+    def test_http_goes_through_proxy(self, gateway, monkeypatch):
+        # The recording server plays the proxy and sees the absolute URL
+        monkeypatch.setenv("http_proxy", gateway.url.removesuffix("/api"))
+        forwarder = GatewayForwarder("http://gateway.invalid/api", "secret")
+        forwarder.post("/v1/test", {"n": 1})
+        assert forwarder.flush(timeout=5.0) is True
+        assert gateway.received == [
+            ("http://gateway.invalid/api/v1/test", "Bearer secret", {"n": 1})
+        ]
+
+    def test_proxy_credentials_sent(self, monkeypatch):
+        monkeypatch.setenv("http_proxy", "user:p%40ss@proxy.invalid:3128")
+        forwarder = GatewayForwarder("http://gateway.invalid/api")
+        assert forwarder._proxy == (
+            "proxy.invalid:3128",
+            {"Proxy-Authorization": "Basic dXNlcjpwQHNz"},
+        )
+
+    def test_no_proxy_bypasses_proxy(self, gateway, monkeypatch):
+        monkeypatch.setenv("http_proxy", "http://127.0.0.1:9")
+        monkeypatch.setenv("no_proxy", "127.0.0.1")
+        forwarder = GatewayForwarder(gateway.url)
+        forwarder.post("/v1/test", {"n": 1})
+        assert forwarder.flush(timeout=5.0) is True
+        assert gateway.received[0][0] == "/api/v1/test"
+
+    def test_https_tunnels_through_proxy(self, monkeypatch):
+        monkeypatch.setenv("https_proxy", "http://proxy.invalid:3128")
+        forwarder = GatewayForwarder("https://gateway.invalid:8443/api")
+        conn = forwarder._connection()
+        assert (conn.host, conn.port) == ("proxy.invalid", 3128)
+        assert (conn._tunnel_host, conn._tunnel_port) == ("gateway.invalid", 8443)
+        assert forwarder._request_prefix == "/api"
+
+
+class TestLedgerForwarding:
+    def make_ledger(self, gateway, tmp_dir, **overrides):
+        import os
+
+        config = AuditLedgerConfig(
+            local_path=os.path.join(tmp_dir, "audit.json"),
+            forward_to_gateway=True,
+            **overrides,
+        )
+        ledger = AuditLedger(config, gateway_url=gateway.url)
+        for _ in range(3):
+            ledger.append(action="tool_call", tool_name="search")
+        assert ledger.flush(timeout=5.0) is True
+        return ledger
+
+    def test_ledger_forwards_single_entries(self, gateway, tmp_dir):
+        self.make_ledger(gateway, tmp_dir)
+        assert {path for path, _, _ in gateway.received} == {"/api/v1/audit"}
+        assert [body["sequence"] for _, _, body in gateway.received] == [1, 2, 3]
+
+    def test_ledger_forwards_batches_when_enabled(self, gateway, tmp_dir):
+        self.make_ledger(gateway, tmp_dir, gateway_batch=True)
+        forwarded = [
+            entry
+            for path, _, body in gateway.received
+            if path == "/api/v1/audit/batch"
+            for entry in body
+        ]
+        assert [e["sequence"] for e in forwarded] == [1, 2, 3]